@@ -0,0 +1,172 @@
+#-------------------------------------------------------------------------------
+#               MCNP OUTPUT PATTERNS
+#
+#   Compiled regular expressions for every line of an MCNP output that the
+#       plotting tools look for. Each pattern carries a cheap substring or
+#       prefix check that has to pass before the regex is run, so lines that
+#       can not match are skipped without touching the regex engine
+#
+#   Run this file to check each pattern against sample lines. Give it an MCNP
+#       output to also time each pattern with and without the fast-path check:
+#           python mcpatterns.py <mcnp output>
+#
+#               Author: Andrew Johnson
+#-------------------------------------------------------------------------------
+#--------
+# Imports
+#--------
+import re
+import sys
+import timeit
+#--------
+# Classes
+#--------
+class Pattern:
+    """Compiled regex rgx guarded by a substring key and/or a line prefix.
+    key and prefix can also be tuples, where any one entry is enough to pass.
+    The checks must hold for every line the regex can match. With re.IGNORECASE
+    the keys are compared against the lower cased line"""
+
+    def __init__(self,rgx,key=None,prefix=None,flags=0):
+        self.rgx = re.compile(rgx,flags)
+        self.key = (key,) if isinstance(key,str) else key
+        self.prefix = prefix
+        self.nocase = bool(flags & re.IGNORECASE)
+        if self.nocase and self.key != None:
+            self.key = tuple(k.lower() for k in self.key)
+
+    def check(self,line):
+        """Return True if line could match the regex"""
+        if self.prefix != None and not line.startswith(self.prefix):
+            return False
+        if self.key != None:
+            if self.nocase:
+                line = line.lower()
+            for k in self.key:
+                if k in line:
+                    return True
+            return False
+        return True
+
+    def match(self,line):
+        if self.check(line):
+            return self.rgx.match(line)
+        return None
+
+    def search(self,line):
+        if self.check(line):
+            return self.rgx.search(line)
+        return None
+
+    def findall(self,line):
+        if self.check(line):
+            return self.rgx.findall(line)
+        return []
+
+#----------
+# Patterns
+#----------
+# processOuts
+cellFlux = Pattern(r'( *tally type 4 * track length estimate of particle flux\. *units *1/cm\*\*2)',
+    key="tally type 4")
+cellMat = Pattern(r'( *cell *mat * *density)',key="density")
+EOB = Pattern(r' ([\*=]+)',prefix=(" *"," ="))     # end of data block starts with * or =
+KCODE = Pattern(r' *\d+- +kcode +(\d+)',key="kcode",flags=re.IGNORECASE)    # echoed kcode card, stores nps/cycle
+finalR = Pattern(r'.+final result +([\d\.]+) +([\d\.]+)',key="final result")    # final eigenvalue and stdv
+runT = Pattern(r' +computer time = +(\d+\.\d{2})',key="computer time =")         # run time
+# mcplottools
+activeKeff = Pattern(r'.+begin active keff cycles',key="begin active keff cycles")
+keff = Pattern(r' *(\d+).+\|.+\|.+\| +([\d\.]+) +([\d\.]+)',key="|")
+fmesh = Pattern(r' +([\d\.-]+) +([\d\.-]+) +([\d\.-]+) +([\d\.]+[Ee][-\+]\d{2}) ([\d\.]+[Ee][-\+]\d{2})')
+# fmesh rows start with blanks then a number. Anchoring the regex there rejects other lines
+#   at their first non-blank character, faster than any substring check run ahead of it
+
+patterns = {"cellFlux":cellFlux,"cellMat":cellMat,"EOB":EOB,"KCODE":KCODE,"finalR":finalR,
+    "runT":runT,"activeKeff":activeKeff,"keff":keff,"fmesh":fmesh}
+#----------
+# Functions
+#----------
+# sample lines for each pattern: (line, whether match() should succeed, expected groups)
+samples = {
+    "cellFlux":[
+        ("           tally type 4    track length estimate of particle flux.      units   1/cm**2        \n",True,None),
+        ("           tally type 2    particle flux averaged over a surface.       units   1/cm**2        \n",False,None)],
+    "cellMat":[
+        ("              cell      mat   density     density     volume       mass            pieces importance\n",True,None),
+        ("        1        1    1   4.00000E-02 1.00000E+00\n",False,None)],
+    "EOB":[
+        (" ===========================================================\n",True,None),
+        (" ***********************************************************\n",True,None),
+        ("  *****\n",False,None)],
+    "KCODE":[
+        ("      271-       KCODE 100000 0.8 50 150\n",True,("100000",)),
+        ("       12-       kcode 1000 1.0 5 50\n",True,("1000",)),
+        ("       12-       Kcode 2500 1.0 5 50\n",True,("2500",)),
+        (" run terminated when     150 kcode cycles were done.\n",False,None)],
+    "finalR":[
+        ("          final result     0.80917         0.00379           0.80537 to 0.81296\n",True,("0.80917","0.00379")),
+        (" final result\n",False,None)],
+    "activeKeff":[
+        (" -------------------  begin active keff cycles  -----------------------\n",True,None),
+        (" -------------------  begin inactive cycles  ---------------------------\n",False,None)],
+    "keff":[
+        ("    54      112078 | 0.85645  0.85645  0.85529  |  0.80454 0.03063   0.80454 0.03063   0.80487 0.02983  |  0.81642 0.01013     53202\n",
+            True,("54","0.81642","0.01013")),
+        ("    51       93860 | 0.73961  0.73961  0.74117  | \n",False,None)],
+    "fmesh":[
+        ("   -200.000  -200.000     0.000 7.27470E-11 3.13292E-02\n",True,("-200.000","-200.000","0.000","7.27470E-11","3.13292E-02")),
+        ("   -200.000  -200.000     0.000 7.27470e-11 3.13292e-02\n",True,None),
+        ("   -200.000  -200.000     0.000 7.27470E+11 3.13292E+02\n",True,("-200.000","-200.000","0.000","7.27470E+11","3.13292E+02")),
+        ("    X direction:   -250.00   -150.00    -50.00     50.00\n",False,None),
+        ("   -200.000  -200.000     0.000 7.27470-11 3.13292-02\n",False,None),
+        (" ------------------------------------------------------------------------------\n",False,None),
+        ("        1        2        2  1.00000E+00 1.67495E+00 1.00000E+07\n",True,None),
+        (" cell 1    1.000     2.000     3.000 1.00000E+00 1.00000E-02\n",False,None),
+        ("        X         Y         Z     Result     Rel Error\n",False,None)],
+    }
+# sample lines for the patterns the parsers search with instead of match
+searchSamples = {
+    "runT":[
+        (" computer time =    3.05 minutes\n",True,("3.05",)),
+        (" computer time so far in this run     3.05 minutes\n",False,None)],
+    }
+
+def selfTest():
+    """Check every pattern against its sample lines, and that the fast-path check never
+    rejects a line its regex accepts. Raises AssertionError on the first failure"""
+    for tests,method in [(samples,"match"),(searchSamples,"search")]:
+        for name,cases in tests.items():
+            p = patterns[name]
+            for line,expect,groups in cases:
+                got = getattr(p,method)(line)
+                raw = getattr(p.rgx,method)(line)
+                assert (got != None) == expect,"{0}.{1} on {2!r}".format(name,method,line)
+                if raw != None:
+                    assert got != None and got.groups() == raw.groups(),\
+                        "{0} fast path rejects {1!r}".format(name,line)
+                if groups != None:
+                    assert got.groups() == groups,"{0} groups {1} on {2!r}".format(name,got.groups(),line)
+
+def benchmark(lines,number=5):
+    """Return a dictionary of (regex search only, parser method with fast path) seconds
+    taken by each pattern over every line in lines, best of number passes"""
+    times = {}
+    for name,p in patterns.items():
+        method = getattr(p,"search" if name in searchSamples else "match")
+        raw = timeit.Timer(lambda: [p.rgx.search(l) for l in lines]).repeat(number,1)
+        fast = timeit.Timer(lambda: [method(l) for l in lines]).repeat(number,1)
+        times[name] = (min(raw),min(fast))
+    return times
+
+if __name__ == "__main__":
+    selfTest()
+    print("All pattern checks passed")
+    if len(sys.argv) != 2:
+        print("Give an mcnp output to time each pattern: python mcpatterns.py <mcnp output>")
+        sys.exit(0)
+    with open(sys.argv[1],'r') as f:
+        lines = f.readlines()
+    print("{0} lines in {1}".format(len(lines),sys.argv[1]))
+    print("{0:<12s}{1:>12s}{2:>12s}{3:>10s}".format("pattern","search (ms)","fast (ms)","speedup"))
+    for name,(raw,fast) in benchmark(lines).items():
+        print("{0:<12s}{1:12.3f}{2:12.3f}{3:10.1f}".format(name,1e3*raw,1e3*fast,raw/fast))
@@ -12,6 +12,7 @@
 import csv
 import processOuts as pouts
 import mcplottools as mpt
+import mcserver as mcs
 #----------
 # Constants
 #----------
@@ -27,8 +28,9 @@ def showCommands():
     print("get summary - read in all mcnp outputs and store summarized data in csv/summary.csv")
     print("plot summary - plot data from csv/summary.csv (effect of changing nps/cycle)")
     print("keff <out1> <out2> - plot convergence of eigenvalue for 1 or 2 MCNP outputs")
-    print("celltally <mode> <out1> - plot cell tally data for 1 MCNP output.\n  Mode: cont or surf")
-    print("fmesh <mode> <name> <xy/xz/yz> - plot fmesh tallies across two coordinates from output.\n  Mode: cont or surf\n  Default coord: xy")
+    print("celltally <mode> <out1> - plot cell tally data for 1 MCNP output.\n  Mode: cont, surf, or image")
+    print("fmesh <mode> <name> <xy/xz/yz> <proj> - plot fmesh tallies across two coordinates from output.\n  Mode: cont, surf, or image\n  Default coord: xy\n  Optional proj: sum, max, or plane number across the third coordinate.\n    Reads the mesh through a memory-mapped <name>.npy for meshes too large for memory")
+    print("serve <port> <cache MB> - serve data and plot requests over http, keeping parsed runs in memory\n  Default port: {0}, default cache: {1} MB".format(mcs.defPort,mcs.defCacheMB))
     print("runDir <working directory> - set the working directory to be cd/runDir")
     print("quit - leave this terminal")
     print("help - show this menu")
@@ -147,8 +149,16 @@ def mcplotter():
                 print(mpt.plotFmesh(runDir,mpath,fpath,uInS[1],uInS[2],"xy"),end="")
             elif len(uInS) == 4:
                 print(mpt.plotFmesh(runDir,mpath,fpath,uInS[1],uInS[2],uInS[3]),end="")
+            elif len(uInS) == 5:
+                print(mpt.plotFmesh(runDir,mpath,fpath,uInS[1],uInS[2],uInS[3],uInS[4]),end="")
             else:
-                print("Bad input for fmesh.\nfmesh <mode> <name> <xy/xz/yz> - plot fmesh tallies across two coordinates from output.\n  Mode: cont or surf\n Default coord: xy")
+                print("Bad input for fmesh.\nfmesh <mode> <name> <xy/xz/yz> <proj> - plot fmesh tallies across two coordinates from output.\n  Mode: cont, surf, or image\n Default coord: xy")
+        # keep parsed runs in memory and answer requests over http
+        elif uInS[0] == "serve":
+            if len(uInS) > 3 or not all(u.isdigit() for u in uInS[1:]):
+                print("Bad input for serve. serve <port> <cache MB>")
+            else:
+                print(mcs.serve(runDir,cpath,mpath,fpath,*[int(u) for u in uInS[1:]]),end="")
         # leave this cursed terminal
         elif uIn == "quit":
             break
@@ -15,17 +15,25 @@
 # Imports
 #--------
 import csv
-import re
+import os
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
 from mpl_toolkits.mplot3d import Axes3D     # 3D plotter
 from matplotlib import cm                   # color maps
+from matplotlib.colors import LogNorm       # log scaling for image plots
+from matplotlib.tri import Triangulation    # irregular cell layouts
+import mcpatterns as mcp
 #----------
 # Constants
 #----------
 pInput = "Save figure(s)? [y/n]\n:  "
-reFmesh = r' ([\d\.-]+) +([\d\.-]+) +([\d\.-]+) +([\d\.Ee]+[-|\+]\d{2}) ([\d\.Ee]+[-|\+]\d{2})'
+maxGridPts = 200        # cont and surf plots are block averaged down to this many points per axis
+plotModes = ["cont","surf","image"]
+latticeFill = 0.5       # cell layouts filling less of their unique x-y grid than this are triangulated
+maxEdgeRatio = 4.0      # triangles with an edge this many times the median edge length span gaps
+fmeshChunk = 100000     # fmesh voxels parsed or reduced at a time when working from a memmap
+mmapProj = ["sum","max"]
 #--------
 # Classes
 #--------
@@ -147,13 +155,10 @@ def plotCycleK(runDir,fpath,t1,t2=None):
             return "  No keff cycle data found in file {0}\n".format(t2)
         t2R = getRunName(t2)
 
-    kFig = plt.figure()
-    plt.plot(cycles1,keff1,'bo',label=t1R)
+    runs = [(t1R,cycles1,keff1)]
     if t2 != None:
-        plt.plot(cycles2,keff2,'ro',label=t2R)
-    plt.legend(numpoints=1)#,loc=4)
-    plt.xlabel("MCNP Active Cycle Number")
-    plt.ylabel("Eigenvalue")
+        runs.append((t2R,cycles2,keff2))
+    kFig = plotK(runs)
     plt.show()
 
     printCheck = input(pInput)
@@ -162,86 +167,204 @@ def plotCycleK(runDir,fpath,t1,t2=None):
         return saveFig(runDir+fpath+runN+"keff"+runExt,kFig)
     return ""
 
+def plotK(runs):
+    """Plot eigenvalue against active cycle for each (name,cycles,keff) in runs on a new figure"""
+    kFig = plt.figure()
+    for (name,cycles,keff),fmt in zip(runs,['bo','ro','go','ko','mo']):
+        plt.plot(cycles,keff,fmt,label=name)
+    plt.legend(numpoints=1)#,loc=4)
+    plt.xlabel("MCNP Active Cycle Number")
+    plt.ylabel("Eigenvalue")
+    return kFig
+
 def getK(fObj):
     """Returns three lists from file object fObj: cycle number, keff, and std dev"""
     cyc = []
     keff = []
     stdv = []
-    activeKeffRgx = r'.+begin active keff cycles'
-    keffRgx = r' *(\d+).+\|.+\|.+\| +([\d\.]+) +([\d\.]+)'
     line = fObj.readline()
     while line != "":
         line = fObj.readline()
-        activeMatch = re.match(activeKeffRgx,line)
-        if activeMatch != None:
+        if mcp.activeKeff.match(line) != None:
             while line != "\n":
                 line = fObj.readline()
-                kMatch = re.findall(keffRgx,line)
-                if kMatch != []:
-                    cyc.append(int(kMatch[0][0]))
-                    keff.append(float(kMatch[0][1]))
-                    stdv.append(float(kMatch[0][2]))
+                kMatch = mcp.keff.match(line)
+                if kMatch != None:
+                    cyc.append(int(kMatch.group(1)))
+                    keff.append(float(kMatch.group(2)))
+                    stdv.append(float(kMatch.group(3)))
             break
     return cyc,keff,stdv
 
-def plotCellTally(runDir,cpath,fpath,mcOut,pMode):
-    """Plot cell tallies from runDir/csv/mcOut as contours"""
+def gridTally(c1,c2,tally):
+    """Return the unique sorted coordinates along both axes and a [len(axe2),len(axe1)]
+    tally matrix. Grid points with no tally data are NaN"""
+    axe1,i1 = np.unique(c1,return_inverse=True)
+    axe2,i2 = np.unique(c2,return_inverse=True)
+    tmat = np.full([len(axe2),len(axe1)],np.nan)
+    tmat[i2,i1] = tally
+    return axe1,axe2,tmat
+
+def reduceGrid(axe1,axe2,tmat,maxPts=maxGridPts):
+    """Block average tmat so that neither axis holds more than maxPts points.
+    NaN entries are left out of the averages"""
+    blk1 = int(np.ceil(len(axe1)/float(maxPts)))
+    blk2 = int(np.ceil(len(axe2)/float(maxPts)))
+    if blk1 <= 1 and blk2 <= 1:
+        return axe1,axe2,tmat
+    i1 = np.arange(0,len(axe1),blk1)        # starting index of each block
+    i2 = np.arange(0,len(axe2),blk2)
+    valid = ~np.isnan(tmat)
+    tSum = np.add.reduceat(np.add.reduceat(np.where(valid,tmat,0.0),i2,axis=0),i1,axis=1)
+    tCnt = np.add.reduceat(np.add.reduceat(valid.astype(int),i2,axis=0),i1,axis=1)
+    with np.errstate(invalid='ignore',divide='ignore'):
+        tmat = tSum/tCnt                    # blocks without any data stay NaN
+    axe1 = np.add.reduceat(axe1,i1)/np.diff(np.append(i1,len(axe1)))
+    axe2 = np.add.reduceat(axe2,i2)/np.diff(np.append(i2,len(axe2)))
+    return axe1,axe2,tmat
+
+def getEdges(axe):
+    """Return the bin edges surrounding each of the sorted points in axe"""
+    if len(axe) == 1:
+        return np.array([axe[0]-0.5,axe[0]+0.5])
+    mids = 0.5*(axe[1:]+axe[:-1])
+    return np.concatenate(([2*axe[0]-mids[0]],mids,[2*axe[-1]-mids[-1]]))
+
+def plotImage(axe1,axe2,tmat):
+    """Plot tmat as an image with log color scaling. NaN and non-positive values are masked"""
+    tmask = np.ma.masked_less_equal(np.ma.masked_invalid(tmat),0.0)
+    norm = LogNorm() if tmask.count() > 0 else None
+    e1 = getEdges(axe1)
+    e2 = getEdges(axe2)
+    if np.allclose(np.diff(e1),e1[1]-e1[0]) and np.allclose(np.diff(e2),e2[1]-e2[0]):
+        img = plt.imshow(tmask,origin='lower',extent=[e1[0],e1[-1],e2[0],e2[-1]],
+            aspect='auto',interpolation='nearest',norm=norm)
+    else:       # non-uniform spacing needs a mesh
+        img = plt.pcolormesh(e1,e2,tmask,norm=norm)
+    plt.colorbar(img,label="Tally Value")
+
+def plotGrid(figObj,mode,axe1,axe2,tmat,label1,label2,maxPts=maxGridPts):
+    """Plot gridded tally data on figObj as contours, surfaces, or images.
+    Contour and surface plots are block averaged down to maxPts points per axis.
+    Returns a message if the grid can not be drawn in this mode, otherwise None"""
+    if mode[:4] == 'imag':
+        plotImage(axe1,axe2,tmat)
+        plt.xlabel(label1)
+        plt.ylabel(label2)
+        return None
+    if min(tmat.shape) < 2:
+        return "Cannot draw {0} plot of a grid {1} x {2} points wide. Try image mode\n".\
+            format(mode,tmat.shape[1],tmat.shape[0])
+    axe1,axe2,tmat = reduceGrid(axe1,axe2,tmat,maxPts)
+    A1,A2 = np.meshgrid(axe1,axe2)
+    if mode[:4] == 'cont':
+        plt.contour(A1,A2,tmat)
+        plt.xlabel(label1)
+        plt.ylabel(label2)
+    elif mode[:4] == 'surf':
+        ax = figObj.add_subplot(111,projection='3d')
+        ax.plot_surface(A1,A2,tmat,rstride=1,cstride=1,cmap = cm.coolwarm)
+        ax.set_xlabel(label1)
+        ax.set_ylabel(label2)
+        ax.set_zlabel("Tally Value")
+    return None
+
+def isLattice(x,y,fill=latticeFill):
+    """Return True if the points x,y fill at least fill of the grid of their unique coordinates"""
+    return len(x) >= fill*len(np.unique(x))*len(np.unique(y))
+
+def triangulate(x,y,t):
+    """Return the Delaunay triangulation of points x,y. Triangles much longer than
+    is typical, which bridge gaps in the geometry, and triangles touching
+    NaN tally values are masked"""
+    tri = Triangulation(x,y)
+    px = tri.x[tri.triangles]
+    py = tri.y[tri.triangles]
+    edges = np.hypot(px-np.roll(px,1,axis=1),py-np.roll(py,1,axis=1))
+    mask = edges.max(axis=1) > maxEdgeRatio*np.median(edges)
+    mask |= np.isnan(t[tri.triangles]).any(axis=1)
+    tri.set_mask(mask)
+    return tri
+
+def plotScattered(figObj,mode,tri,t,label1,label2):
+    """Plot tally values t at the points of triangulation tri on figObj as contours,
+    surfaces, or images"""
+    if mode[:4] == 'imag':
+        mask = tri.mask | (t[tri.triangles] <= 0.0).any(axis=1)     # log scale
+        tri.set_mask(mask)
+        norm = LogNorm() if not mask.all() else None
+        img = plt.tripcolor(tri,np.where(t > 0.0,t,1.0),norm=norm)
+        plt.colorbar(img,label="Tally Value")
+        plt.xlabel(label1)
+        plt.ylabel(label2)
+    elif mode[:4] == 'cont':
+        plt.tricontour(tri,np.where(np.isnan(t),0.0,t))
+        plt.xlabel(label1)
+        plt.ylabel(label2)
+    elif mode[:4] == 'surf':
+        ax = figObj.add_subplot(111,projection='3d')
+        ax.plot_trisurf(tri,np.where(np.isnan(t),0.0,t),cmap = cm.coolwarm)
+        ax.set_xlabel(label1)
+        ax.set_ylabel(label2)
+        ax.set_zlabel("Tally Value")
+
+def plotCells(figObj,mode,x,y,t,maxPts=maxGridPts):
+    """Plot cell tallies t at cell centers x,y on figObj. Cells on a lattice are gridded,
+    other layouts are triangulated so the cost follows the number of cells.
+    Returns a message if the cells can not be plotted in this mode, otherwise None"""
+    label1 = "Cell X Location (cm)"
+    label2 = "Cell Y Location (cm)"
+    if isLattice(x,y):
+        xG,yG,tmat = gridTally(x,y,t)
+        return plotGrid(figObj,mode,xG,yG,tmat,label1,label2,maxPts)
+    if len(x) < 3:
+        return "Cannot triangulate {0} cell(s). Need at least 3 cells\n".format(len(x))
+    x = np.asarray(x,dtype=float)
+    y = np.asarray(y,dtype=float)
+    t = np.asarray(t,dtype=float)
+    try:
+        tri = triangulate(x,y,t)
+    except (RuntimeError,ValueError):       # qhull fails when all centers lie on one line
+        return "Cannot triangulate the cell centers. They may all lie on one line\n"
+    plotScattered(figObj,mode,tri,t,label1,label2)
+    return None
+
+def readCellTally(fName):
+    """Return lists of cell x and y locations and tally values from the csv file fName"""
+    with open(fName,'r') as fObj:
+        cr = csv.reader(fObj,delimiter=",")
+        r = 0
+        x = []
+        y = []
+        t = []
+        for row in cr:
+            if r > 0:       # header lines
+                x.append(float(row[1]))
+                y.append(float(row[2]))
+                t.append(float(row[4]))     # tally data
+            else:
+                r += 1
+    return x,y,t
 
+def plotCellTally(runDir,cpath,fpath,mcOut,pMode,maxPts=maxGridPts):
+    """Plot cell tallies from runDir/csv/mcOut as contours, surfaces, or images"""
+
+    if pMode[:4] not in [m[:4] for m in plotModes]:
+        return "Plot mode {0} not supported.".format(pMode)
     if mcOut[-4:] != ".csv":
         print("  Adding .csv to {0}".format(mcOut))
         mcOut += ".csv"
 
     try:
-        fObj = open(runDir+cpath+mcOut,'r')
+        x,y,t = readCellTally(runDir+cpath+mcOut)
     except IOError:
         return "Could not access file {0}\n".format(runDir+cpath+mcOut)
-
-    cr = csv.reader(fObj,delimiter=",")
-    r = 0
-    x = []
-    y = []
-    t = []
-    xG = []
-    yG = []
-    for row in cr:
-        if r > 0:       # header lines
-            x.append(float(row[1]))
-            if x[-1] not in xG:
-                xG.append(x[-1])    # unique x coordinates for plotting
-            y.append(float(row[2]))
-            if y[-1] not in yG:
-                yG.append(y[-1])
-            t.append(float(row[4]))     # tally data
-        else:
-            r += 1
-    fObj.close()
-    # Prepare to plot by making axes
-    xG.sort()       # put the unique values in descending order
-    yG.sort()
-    xL = len(xG)
-    yL = len(yG)
-    cells = len(x)
-    X,Y = np.meshgrid(xG,yG)        # create matrices of x and y grid vectors for plotting
-    tmat = np.empty([yL,xL])        # tally matrix
-    for jj in range(yL):
-        for ii in  range(xL):
-            for r in range(cells):
-                if X[jj,ii] == x[r] and Y[jj,ii] == y[r]:
-                    tmat[yL-jj-1,ii] = t[r]
     # Plot tally data
     tallyFig = plt.figure()
-    if pMode[:4] == 'cont':
-        plt.contour(X,Y,tmat)
-        plt.xlabel("Cell X Location (cm)")
-        plt.ylabel("Cell Y Location (cm)")
-    elif pMode[:4] == 'surf':
-        ax = tallyFig.gca(projection='3d')
-        ax.plot_surface(X,Y,tmat,rstride=1,cstride=1,cmap = cm.coolwarm)
-        ax.set_xlabel("Cell X Location (cm)")
-        ax.set_ylabel("Cell Y Location (cm)")
-        ax.set_zlabel("Tally Value")
-    else:
-        return "Plot mode {0} not supported.".format(pMode)
+    msg = plotCells(tallyFig,pMode,x,y,t,maxPts)
+    if msg != None:
+        plt.close(tallyFig)
+        return msg
     plt.show()
     printCheck = input(pInput)
     if printCheck[0] == 'y':
@@ -277,80 +400,165 @@ def main(sumFile,runDir,cpath,fpath):
     return ""
 
 
-def plotFmesh(runDir,mpath,fpath,mode,fName,coord):
-    """Plot the tally results from file runDir/mpath/fName across coordinates denoted by pair coord"""
+def getFmeshBounds(fObj):
+    """Read the fmesh header from fObj up to the start of the tally table and return the
+    x, y, and z bin boundaries. Returns None if the mesh is not rectangular"""
+    bounds = {}
+    key = None
+    for line in fObj:
+        words = line.split()
+        if "Result" in words:           # column headers, table starts on next line
+            break
+        if "direction:" in words:
+            key = words[0].lower()
+            words = words[words.index("direction:")+1:]
+            bounds[key] = []
+        elif words == [] or "Energy" in words:
+            key = None
+        if key != None:
+            bounds[key].extend([float(w) for w in words])     # boundaries can wrap lines
+    if not all(k in bounds for k in "xyz"):
+        return None
+    return [np.array(bounds[k]) for k in "xyz"]
+
+def writeFmeshRows(mm,bounds,rows):
+    """Write a chunk of [x,y,z,result] rows into the voxels of memmap mm"""
+    arr = np.array(rows,dtype=float)
+    idx = tuple(np.clip(np.searchsorted(bounds[k],arr[:,k])-1,0,mm.shape[k]-1) for k in range(3))
+    mm[idx] = arr[:,3]
+
+def getFmeshMmap(fPath,chunk=fmeshChunk):
+    """Return the bin boundaries and a read-only [nx,ny,nz] memmap of the fmesh tally in fPath.
+    The table is streamed chunk rows at a time into fPath.npy, which is reused as long as it
+    is newer than fPath. Returns None,None if fPath does not hold a rectangular mesh"""
+    npyPath = fPath+".npy"
+    with open(fPath,'r') as f:
+        bounds = getFmeshBounds(f)
+        if bounds == None:
+            return None,None
+        if os.path.exists(npyPath) and os.path.getmtime(npyPath) >= os.path.getmtime(fPath):
+            return bounds,np.load(npyPath,mmap_mode='r')
+        shape = tuple(len(b)-1 for b in bounds)
+        tmpPath = npyPath+".tmp"        # only replaces npyPath once the whole table is read
+        mm = np.lib.format.open_memmap(tmpPath,mode='w+',dtype=float,shape=shape)
+        step = max(1,chunk//(shape[1]*shape[2]))
+        for i in range(0,shape[0],step):
+            mm[i:i+step] = np.nan       # voxels missing from the table stay NaN
+        rows = []
+        for line in f:
+            mat = mcp.fmesh.match(line)
+            if mat != None:
+                rows.append(mat.groups()[:4])
+                if len(rows) >= chunk:
+                    writeFmeshRows(mm,bounds,rows)
+                    rows = []
+        if rows != []:
+            writeFmeshRows(mm,bounds,rows)
+    mm.flush()
+    del mm
+    os.replace(tmpPath,npyPath)
+    return bounds,np.load(npyPath,mmap_mode='r')
 
-    if mode not in ["cont","surf"]:
-        return "Print method {0} not supported at this time. Only cont and surf\n".format(mode)
+def sliceMmap(mm,coord,proj,chunk=fmeshChunk):
+    """Return the [len2,len1] plane of memmap mm across coordinate pair coord.
+    proj is sum or max over the remaining axis, or the index of a plane along it.
+    Projections are reduced chunk voxels at a time"""
+    ax1 = "xyz".index(coord[0])
+    ax2 = "xyz".index(coord[1])
+    ax3 = 3-ax1-ax2
+    if proj in mmapProj:
+        reduce = np.nansum if proj == "sum" else np.fmax.reduce
+        combine = np.add if proj == "sum" else np.fmax
+        step = max(1,chunk//(mm.shape[1]*mm.shape[2]))
+        plane = None
+        parts = []
+        for i in range(0,mm.shape[0],step):
+            part = reduce(np.array(mm[i:i+step]),axis=ax3)
+            if ax3 != 0:
+                parts.append(part)
+            elif plane is None:
+                plane = part
+            else:
+                plane = combine(plane,part)
+        if ax3 != 0:
+            plane = np.concatenate(parts)
+    else:
+        sl = [slice(None)]*3
+        sl[ax3] = proj
+        plane = np.array(mm[tuple(sl)])
+    if ax1 < ax2:       # plane axes are in xyz order
+        return plane.T
+    return plane
+
+def readFmesh(fName):
+    """Return a [4,rows] array of the x, y, and z positions and tally values in the
+    fmesh table of fName"""
+    rows = []
+    with open(fName,'r') as f:
+        for line in f:
+            mat = mcp.fmesh.match(line)
+            if mat != None:
+                rows.append(mat.groups()[:4])
+    return np.array(rows,dtype=float).reshape(-1,4).T
+
+def gridFmesh(mesh,coord):
+    """Return the axes and [len2,len1] tally matrix of mesh from readFmesh across
+    coordinate pair coord"""
+    return gridTally(mesh["xyz".index(coord[0])],mesh["xyz".index(coord[1])],mesh[3])
+
+def sliceFmesh(bounds,mm,coord,proj):
+    """Return the axes and [len2,len1] plane of memmap mm from getFmeshMmap across
+    coordinate pair coord, reduced by sum, max, or the index of a single plane.
+    Raises ValueError if the mesh can not be reduced"""
+    if mm is None:
+        raise ValueError("No rectangular fmesh boundaries found")
+    axe1Col = "xyz".index(coord[0])
+    axe2Col = "xyz".index(coord[1])
+    if proj not in mmapProj:
+        proj = int(proj)
+        nPlanes = mm.shape[3-axe1Col-axe2Col]
+        if proj >= nPlanes:
+            raise ValueError("Plane {0} out of range. Mesh has {1} planes across {2}".format(proj,nPlanes,coord))
+    axe1 = 0.5*(bounds[axe1Col][1:]+bounds[axe1Col][:-1])      # voxel centers
+    axe2 = 0.5*(bounds[axe2Col][1:]+bounds[axe2Col][:-1])
+    return axe1,axe2,sliceMmap(mm,coord,proj)
+
+def getFmesh(fName,coord,proj=None):
+    """Return the axes and [len2,len1] tally matrix of the fmesh in fName across coordinate
+    pair coord. If proj is given, the mesh is read through a memmap and reduced across the
+    remaining coordinate by sum, max, or the index of a single plane.
+    Raises ValueError if the mesh can not be reduced"""
+    if proj == None:
+        return gridFmesh(readFmesh(fName),coord)
+    bounds,mm = getFmeshMmap(fName)
+    return sliceFmesh(bounds,mm,coord,proj)
+
+def plotFmesh(runDir,mpath,fpath,mode,fName,coord,proj=None,maxPts=maxGridPts):
+    """Plot the tally results from file runDir/mpath/fName across coordinates denoted by pair coord.
+    If proj is given, the mesh is read through a memmap and reduced across the remaining
+    coordinate by sum, max, or the index of a single plane"""
+
+    if mode not in plotModes:
+        return "Print method {0} not supported at this time. Only cont, surf, and image\n".format(mode)
     if coord not in ["xy","yx","zy","yz","xz","zx"]:
         return "Coordinate pair {0} not supported at this time. Only pairs of x, y, and z\n".format(coord)
+    if proj != None and proj not in mmapProj and not proj.isdigit():
+        return "Projection {0} not supported at this time. Only sum, max, or plane number\n".format(proj)
 
     try:
-        f = open(runDir+mpath+fName,'r')
+        axe1,axe2,tmat = getFmesh(runDir+mpath+fName,coord,proj)
     except IOError:
         return "File {0} not accessible. Could be in wrong directory.\n  Please move into {1}{2}\n".\
             format(fName,runDir,mpath)
-
-    lines = f.readlines()
-    c1 = []
-    c2 = []         # vectors to contain all the position data
-    axe1 = []
-    axe2 = []       # vectors to contain unique position data
-    tally = []
-    if coord[0] == "x":
-        axe1Col = 0
-        label1 = "X Position (cm)"
-    elif coord[0] == "y":
-        axe1Col = 1
-        label1 = "Y Position (cm)"
-    elif coord[0] == "z":
-        axe1Col = 2
-        label1 = "Z Position (cm)"
-    if coord[1] == "x":
-        axe2Col = 0
-        label2 = "X Position (cm)"
-    elif coord[1] == 'y':
-        axe2Col = 1
-        label2 = "Y Position (cm)"
-    elif coord[1] == "z":
-        axe2Col = 2
-        label2 = "Z Position (cm)"
-    for line in lines:
-        if re.findall(reFmesh,line) != []:
-            mat = re.findall(reFmesh,line)
-            c1.append(float(mat[0][axe1Col]))
-            c2.append(float(mat[0][axe2Col]))
-            if c1[-1] not in axe1:
-                axe1.append(c1[-1])
-            if c2[-1] not in axe2:
-                axe2.append(c2[-1])
-            tally.append(float(mat[0][3]))
-#----SOME DAY TURN THIS INTO A FUNCTION ON ITS OWN VVVVVV
-    axe1.sort()
-    axe2.sort()
-    A1,A2 = np.meshgrid(axe1,axe2)
-    len1 = len(axe1)
-    len2 = len(axe2)
-    tmat = np.empty([len2,len1])
-    vals = len(c1)
-    print(len1,len2,A1.shape,A2.shape)
-    for jj in range(len2):
-        for ii in range(len1):
-            for r in range(vals):
-                if A1[jj,ii] == c1[r] and A2[jj,ii] == c2[r]:
-                    tmat[len2-1-jj,ii] = tally[r]
-#----SOME DAY TURN THIS INTO A FUNCTION ON ITS OWN ^^^^^^
+    except ValueError as err:
+        return "{0}\n".format(err)
+    label1 = coord[0].upper()+" Position (cm)"
+    label2 = coord[1].upper()+" Position (cm)"
     fmeshFig = plt.figure()
-    if mode == 'cont':
-        plt.contour(A1,A2,tmat)
-        plt.xlabel(label1)
-        plt.ylabel(label2)
-    elif mode == 'surf':
-        ax = fmeshFig.gca(projection='3d')
-        ax.plot_surface(A1,A2,tmat,rstride=1,cstride=1,cmap = cm.coolwarm)
-        ax.set_xlabel(label1)
-        ax.set_ylabel(label2)
-        ax.set_zlabel("Tally Value")
+    msg = plotGrid(fmeshFig,mode,axe1,axe2,tmat,label1,label2,maxPts)
+    if msg != None:
+        plt.close(fmeshFig)
+        return msg
     plt.show()
     printCheck = input(pInput)
     if printCheck[0] == 'y':
@@ -0,0 +1,254 @@
+#-------------------------------------------------------------------------------
+#               MCPLOTTER DATA SERVER
+#
+#   Long-lived HTTP server that keeps parsed MCNP results in memory so repeated
+#       requests for the same run are not read from disk again
+#       - keff cycle data, cell tally data, and parsed fmesh tables (or their
+#           memmaps) are held in an LRU cache with a cap on the memory used
+#       - cached results are dropped once their source file changes
+#
+#   Requests are GET with query parameters and answered with JSON:
+#       /keff?file=<out>
+#       /celltally?file=<out>
+#       /fmesh?file=<out>&coord=<xy/xz/yz>&proj=<sum/max/plane #>
+#       /plot?kind=<keff/celltally/fmesh>&file=<out>&name=<fig name>
+#           [&file2=<out>] [&mode=<cont/surf/image>] [&coord=...] [&proj=...]
+#       /status
+#
+#               Author: Andrew Johnson
+#-------------------------------------------------------------------------------
+#--------
+# Imports
+#--------
+import json
+import os
+import sys
+from collections import OrderedDict
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+import matplotlib.pyplot as plt
+import mcplottools as mpt
+#----------
+# Constants
+#----------
+defPort = 8765
+defCacheMB = 512
+#--------
+# Classes
+#--------
+class RunCache:
+    """LRU cache of parsed results keyed by request, each tied to the source file it came from"""
+
+    def __init__(self,maxBytes):
+        self.maxBytes = maxBytes
+        self.nBytes = 0
+        self.entries = OrderedDict()    # key: (path, file stamp, size in bytes, value)
+
+    def stamp(self,path):
+        """Modification time and size of path, used to spot changed files"""
+        st = os.stat(path)
+        return st.st_mtime,st.st_size
+
+    def drop(self,key):
+        self.nBytes -= self.entries[key][2]
+        del self.entries[key]
+
+    def dropStale(self):
+        """Remove every entry whose source file changed or disappeared"""
+        for key in list(self.entries.keys()):
+            path,stamp = self.entries[key][:2]
+            try:
+                if self.stamp(path) != stamp:
+                    self.drop(key)
+            except OSError:
+                self.drop(key)
+
+    def get(self,key,path,loader):
+        """Return the cached value for key, calling loader() to parse path on a miss.
+        Entries whose source files changed are dropped first"""
+        self.dropStale()
+        stamp = self.stamp(path)
+        if key in self.entries:
+            self.entries.move_to_end(key)       # still current after dropStale
+            return self.entries[key][3]
+        value = loader()
+        size = getSize(value)
+        while self.entries and self.nBytes+size > self.maxBytes:
+            self.drop(next(iter(self.entries)))     # least recently used
+        if size <= self.maxBytes:
+            self.entries[key] = (path,stamp,size,value)
+            self.nBytes += size
+        return value
+
+
+class PlotHandler(BaseHTTPRequestHandler):
+    """Answer data and plot requests from the cache attached to the server"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k,v in parse_qs(url.query).items()}
+        route = url.path.strip("/")
+        try:
+            if route == "status":
+                body = self.server.status()
+            elif route in ["keff","celltally","fmesh"]:
+                body = self.server.getData(route,query)
+            elif route == "plot":
+                body = self.server.plot(query)
+            else:
+                return self.reply(404,{"error":"Unknown request /{0}".format(route)})
+        except KeyError as err:
+            return self.reply(400,{"error":"Missing parameter {0}".format(err)})
+        except (IOError,OSError) as err:
+            return self.reply(404,{"error":str(err)})
+        except ValueError as err:
+            return self.reply(400,{"error":str(err)})
+        except Exception as err:        # plotting failures still get an answer
+            return self.reply(500,{"error":"{0}: {1}".format(type(err).__name__,err)})
+        self.reply(200,body)
+
+    def reply(self,code,body):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type","application/json")
+        self.send_header("Content-Length",str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self,format,*args):
+        print("  "+format % args)
+
+
+class PlotServer(HTTPServer):
+    """HTTP server holding the run directory layout and the parsed run cache"""
+
+    def __init__(self,port,runDir,cpath,mpath,fpath,maxBytes):
+        HTTPServer.__init__(self,("localhost",port),PlotHandler)
+        self.runDir = runDir
+        self.cpath = cpath
+        self.mpath = mpath
+        self.fpath = fpath
+        self.cache = RunCache(maxBytes)
+
+    def status(self):
+        self.cache.dropStale()
+        return {"entries":[list(k) for k in self.cache.entries.keys()],
+            "bytes":self.cache.nBytes,"maxBytes":self.cache.maxBytes}
+
+    def load(self,kind,query):
+        """Return the parsed data of type kind for the file named in query"""
+        if kind == "keff":
+            path = self.runDir+self.mpath+checkName(query["file"])
+            return self.cache.get((kind,path),path,lambda: readK(path))
+        if kind == "celltally":
+            mcOut = checkName(query["file"])
+            if mcOut[-4:] != ".csv":
+                mcOut += ".csv"
+            path = self.runDir+self.cpath+mcOut
+            return self.cache.get((kind,path),path,lambda: mpt.readCellTally(path))
+        coord = query.get("coord","xy")
+        proj = query.get("proj")
+        if coord not in ["xy","yx","zy","yz","xz","zx"]:
+            raise ValueError("Coordinate pair {0} not supported".format(coord))
+        if proj != None and proj not in mpt.mmapProj and not proj.isdigit():
+            raise ValueError("Projection {0} not supported".format(proj))
+        path = self.runDir+self.mpath+checkName(query["file"])
+        # cache the parsed mesh once per file, planes are cut from it per request
+        if proj == None:
+            mesh = self.cache.get((kind,path),path,lambda: mpt.readFmesh(path))
+            return mpt.gridFmesh(mesh,coord)
+        bounds,mm = self.cache.get((kind+" mmap",path),path,lambda: mpt.getFmeshMmap(path))
+        return mpt.sliceFmesh(bounds,mm,coord,proj)
+
+    def getData(self,kind,query):
+        data = self.load(kind,query)
+        if kind == "keff":
+            return {"cycle":data[0],"keff":data[1],"stdv":data[2]}
+        if kind == "celltally":
+            return {"x":data[0],"y":data[1],"tally":data[2]}
+        return {"axe1":toList(data[0]),"axe2":toList(data[1]),"tally":toList(data[2])}
+
+    def plot(self,query):
+        """Draw the requested plot without showing it and save it to runDir/fpath/name"""
+        kind = query["kind"]
+        mode = query.get("mode","cont")
+        name = checkName(query["name"])
+        if kind not in ["keff","celltally","fmesh"]:
+            raise ValueError("Plot kind {0} not supported".format(kind))
+        if kind != "keff" and mode not in mpt.plotModes:
+            raise ValueError("Plot mode {0} not supported".format(mode))
+        if kind == "keff":
+            runs = []
+            for f in [query["file"],query.get("file2")]:
+                if f != None:
+                    cyc,keff,stdv = self.load(kind,{"file":f})
+                    runs.append((mpt.getRunName(f),cyc,keff))
+        else:
+            data = self.load(kind,query)
+        openFigs = set(plt.get_fignums())
+        try:
+            if kind == "keff":
+                fig = mpt.plotK(runs)
+            elif kind == "celltally":
+                fig = plt.figure()
+                msg = mpt.plotCells(fig,mode,*data)
+                if msg != None:
+                    raise ValueError(msg.strip())
+            else:
+                coord = query.get("coord","xy")
+                fig = plt.figure()
+                msg = mpt.plotGrid(fig,mode,*data,coord[0].upper()+" Position (cm)",
+                    coord[1].upper()+" Position (cm)")
+                if msg != None:
+                    raise ValueError(msg.strip())
+            msg = mpt.saveFig(self.runDir+self.fpath+name,fig)
+        finally:
+            for n in set(plt.get_fignums())-openFigs:     # never shown, so always close
+                plt.close(n)
+        return {"message":msg.strip()}
+
+#----------
+# Functions
+#----------
+def checkName(name):
+    """Return name if it is a plain file name. Raise ValueError if it could reach
+    outside the run directory"""
+    if name == "" or name in [".",".."] or "/" in name or os.sep in name or \
+            (os.altsep != None and os.altsep in name) or ".." in name:
+        raise ValueError("Bad file name {0}. Give only a file name, without directories".format(name))
+    return name
+
+def readK(path):
+    """Return the cycle, keff, and std dev lists from the mcnp output at path"""
+    with open(path,'r') as fObj:
+        return mpt.getK(fObj)
+
+def getSize(value):
+    """Rough size in bytes of a parsed result made of arrays, lists, and numbers.
+    Memmaps only count their object, since their data stays in the file"""
+    if isinstance(value,np.memmap):
+        return sys.getsizeof(value)
+    if isinstance(value,np.ndarray):
+        return value.nbytes
+    if isinstance(value,(list,tuple)):
+        return sys.getsizeof(value)+sum(getSize(v) for v in value)
+    return sys.getsizeof(value)
+
+def toList(arr):
+    """Return arr as nested lists with NaN replaced by None so it can be written as JSON"""
+    arr = np.asarray(arr,dtype=object)
+    arr[np.isnan(arr.astype(float))] = None
+    return arr.tolist()
+
+def serve(runDir,cpath,mpath,fpath,port=defPort,cacheMB=defCacheMB):
+    """Serve plot and data requests for runDir on localhost:port until interrupted"""
+    server = PlotServer(port,runDir,cpath,mpath,fpath,int(cacheMB*2**20))
+    print("Serving {0} on http://localhost:{1}/ with a {2} MB cache. Ctrl-C to stop".\
+        format(runDir if runDir != "" else ".",port,cacheMB))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+    return "Server stopped\n"
@@ -18,17 +18,8 @@
 #--------
 # Imports
 #--------
-import re
 import csv
-#----------
-# Constants
-#----------
-reCellFlux = r'( *tally type 4 * track length estimate of particle flux\. *units *1/cm\*\*2)'
-reCellMat = r'( *cell *mat * *density)'
-reEOB = r' ([\*=]+)'     # end of data block will have either * or = as the first characters
-reKCODE = r'.+[kcode]{5}|[KCODE]{5} (\d+) '         # match kcode line and store nps/cycle
-reFinalR = r'.+final result +([\d\.]+) +([\d\.]+)'  # match final eigenvalue result and stdv
-reRunT = r' +computer time = +(\d+\.\d{2})'            # match run time
+import mcpatterns as mcp
 #--------
 # Classes
 #--------
@@ -100,7 +91,7 @@ def getBlock(dataList,indx):
     while indx < len(dataList):
         line = dataList[indx]
         if len(line)>0:
-            if re.match(reEOB,line) != None:        # end of tally block
+            if mcp.EOB.match(line) != None:        # end of tally block
                 break
             else:
                 cellBlock.append(line.strip().split())
@@ -196,19 +187,24 @@ def main(infile,runDir,cpath,mpath):
     lines = f.readlines()
     l = 0
     for line in lines:
-        if re.match(reCellFlux,line) != None:
+        if mcp.cellFlux.match(line) != None:
             tallydata = getBlock(lines,l)
             getCellTally(tallydata)
-        elif re.match(reCellMat,line) != None:
+        elif mcp.cellMat.match(line) != None:
             matData = getBlock(lines,l)
             getCellMat(matData)
-        elif re.findall(reRunT,line) != []:
-            runM = re.findall(reRunT,line)[0]
-        elif re.findall(reKCODE,line) != [] and npsM == None:
-            npsM = re.findall(reKCODE,line)[0]
-        elif re.findall(reFinalR,line) != []:
-            eigM = re.findall(reFinalR,line)[0][0]
-            stdv = re.findall(reFinalR,line)[0][1]
+        else:
+            runMat = mcp.runT.search(line)
+            if runMat != None:
+                runM = runMat.group(1)
+            else:
+                kMat = mcp.KCODE.match(line) if npsM == None else None
+                if kMat != None:
+                    npsM = kMat.group(1)
+                else:
+                    finalMat = mcp.finalR.match(line)
+                    if finalMat != None:
+                        eigM,stdv = finalMat.groups()
         l += 1
     f.close()
     if tallydata == None:       # could not find tally data in file